@@ -5,23 +5,96 @@ Runs Ollama with OpenAI-compatible endpoints on port 8003
 """
 
 import os
-import json
 import time
-import uuid
+import asyncio
+from functools import lru_cache
+from hashlib import sha256
 from typing import Optional, List, Dict, Any
+import numpy as np
+from cachetools import TTLCache
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import httpx
+import orjson
 import uvicorn
 
+# HTTP/2 multiplexing needs the optional h2 package (httpx[http2]);
+# without it the client stays on HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Configuration
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "qwen2.5:7b")
 PORT = int(os.getenv("PORT", 8003))
+WORKERS = int(os.getenv("WORKERS", os.cpu_count() or 2))
+# "ndjson" (Ollama's native newline framing) or "length" when a gateway
+# in front of Ollama prefixes each frame with "<len>\n"
+OLLAMA_FRAMING = os.getenv("OLLAMA_FRAMING", "ndjson")
+
+# httpx's json= kwarg serializes with stdlib json; send orjson bytes instead
+JSON_HEADERS = {"content-type": "application/json"}
+
+# Shared HTTP client with keep-alive so every Ollama call reuses connections
+# instead of paying a fresh TCP handshake per request
+CLIENT: Optional[httpx.AsyncClient] = None
+
+# Exact-match cache for deterministic non-streaming requests, keyed on a
+# hash of (model, messages/prompt, temperature, max_tokens)
+RESPONSE_CACHE = TTLCache(maxsize=10_000, ttl=3600)
+
+# Optional semantic L2 cache: on an exact-match miss, embed the user
+# messages and return a stored response if cosine similarity is high
+# enough. Catches paraphrased repeats the hash cache misses.
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "false").lower() in ("1", "true", "yes")
+EMBED_MODEL = os.getenv("EMBED_MODEL", "nomic-embed-text")
+SIM_THRESHOLD = 0.92
+SEMANTIC_CACHE_SIZE = 1000
+
+SEMANTIC_EMBEDDINGS: List[Any] = []  # unit-norm vectors, parallel to the lists below
+SEMANTIC_PARAMS: List[tuple] = []  # (model, temperature, max_tokens) per entry
+SEMANTIC_RESPONSES: List[dict] = []
+
+# Short-lived cache for /v1/models: SDKs hit it on every session start
+# but the model list rarely changes. (fetched_at, payload)
+MODELS_CACHE: Optional[tuple] = None
+MODELS_CACHE_TTL = 10.0
+MODELS_LOCK = asyncio.Lock()
+
+app = FastAPI(title="Ollama OpenAI API", version="1.0.0", default_response_class=ORJSONResponse)
+
+@app.on_event("startup")
+async def startup():
+    global CLIENT
+    # HTTP/2 lets concurrent streams share one connection to Ollama;
+    # negotiation falls back to HTTP/1.1 if the backend doesn't speak it
+    CLIENT = httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_keepalive_connections=128,
+            max_connections=256,
+            keepalive_expiry=60.0,
+        ),
+        timeout=httpx.Timeout(300.0, connect=5.0),
+    )
 
-app = FastAPI(title="Ollama OpenAI API", version="1.0.0")
+@app.on_event("shutdown")
+async def shutdown():
+    await CLIENT.aclose()
+
+# Upstream failures surface as 502 through one handler instead of each
+# endpoint catching Exception and materializing a traceback per error
+@app.exception_handler(httpx.HTTPError)
+async def httpx_error_handler(request: Request, exc: httpx.HTTPError):
+    return ORJSONResponse(
+        status_code=502,
+        content={"error": {"type": exc.__class__.__name__, "message": str(exc)}}
+    )
 
 # Enable CORS
 app.add_middleware(
@@ -51,6 +124,42 @@ class CompletionRequest(BaseModel):
     max_tokens: Optional[int] = None
     stream: bool = False
 
+async def embed_text(text: str):
+    """Embed text via Ollama, normalized to unit length"""
+    response = await CLIENT.post(
+        f"{OLLAMA_HOST}/api/embeddings",
+        content=orjson.dumps({"model": EMBED_MODEL, "prompt": text}),
+        headers=JSON_HEADERS
+    )
+    response.raise_for_status()
+    vec = np.asarray(orjson.loads(response.content)["embedding"], dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+def semantic_lookup(query_vec, params: tuple):
+    """Return the cached response most similar to query_vec, or None.
+
+    Only entries stored under the same (model, temperature, max_tokens)
+    are candidates, so one model's answer is never served for another.
+    """
+    candidates = [i for i, p in enumerate(SEMANTIC_PARAMS) if p == params]
+    if not candidates:
+        return None
+    sims = np.vstack([SEMANTIC_EMBEDDINGS[i] for i in candidates]) @ query_vec
+    best = int(np.argmax(sims))
+    if sims[best] > SIM_THRESHOLD:
+        return SEMANTIC_RESPONSES[candidates[best]]
+    return None
+
+def semantic_store(query_vec, params: tuple, response: dict):
+    if len(SEMANTIC_EMBEDDINGS) >= SEMANTIC_CACHE_SIZE:
+        SEMANTIC_EMBEDDINGS.pop(0)
+        SEMANTIC_PARAMS.pop(0)
+        SEMANTIC_RESPONSES.pop(0)
+    SEMANTIC_EMBEDDINGS.append(query_vec)
+    SEMANTIC_PARAMS.append(params)
+    SEMANTIC_RESPONSES.append(response)
+
 @app.get("/")
 async def root():
     return {"message": "Ollama OpenAI-Compatible API", "status": "running"}
@@ -58,214 +167,418 @@ async def root():
 @app.get("/health")
 async def health():
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{OLLAMA_HOST}/api/tags", timeout=5.0)
-            if response.status_code == 200:
-                return {"status": "healthy", "ollama": "connected"}
-    except Exception as e:
+        response = await CLIENT.get(f"{OLLAMA_HOST}/api/tags", timeout=5.0)
+        if response.status_code == 200:
+            return {"status": "healthy", "ollama": "connected"}
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=503, detail=f"Ollama not available: {str(e)}")
 
 @app.get("/v1/models")
 async def list_models():
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{OLLAMA_HOST}/api/tags")
-            if response.status_code == 200:
-                ollama_models = response.json().get("models", [])
-                models = [
-                    {
-                        "id": model["name"],
-                        "object": "model",
-                        "created": int(time.time()),
-                        "owned_by": "ollama"
-                    }
-                    for model in ollama_models
-                ]
-                return {"object": "list", "data": models}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.post("/v1/chat/completions")
-async def chat_completions(request: ChatCompletionRequest):
-    # Convert OpenAI format to Ollama format
-    ollama_messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
-    
-    ollama_request = {
-        "model": request.model,
-        "messages": ollama_messages,
-        "stream": request.stream,
-        "options": {
-            "temperature": request.temperature,
-        }
-    }
-    
-    if request.max_tokens:
-        ollama_request["options"]["num_predict"] = request.max_tokens
+    global MODELS_CACHE
+    if MODELS_CACHE and time.time() - MODELS_CACHE[0] < MODELS_CACHE_TTL:
+        return MODELS_CACHE[1]
+
+    # Lock so a burst on an expired cache triggers one upstream refresh;
+    # the rest wait and reuse it
+    async with MODELS_LOCK:
+        if MODELS_CACHE and time.time() - MODELS_CACHE[0] < MODELS_CACHE_TTL:
+            return MODELS_CACHE[1]
+        response = await CLIENT.get(f"{OLLAMA_HOST}/api/tags")
+        response.raise_for_status()
+        ollama_models = response.json().get("models", [])
+        models = [
+            {
+                "id": model["name"],
+                "object": "model",
+                "created": int(time.time()),
+                "owned_by": "ollama"
+            }
+            for model in ollama_models
+        ]
+        payload = {"object": "list", "data": models}
+        MODELS_CACHE = (time.time(), payload)
+        return payload
 
+# The ChatCompletionRequest schema is attached via openapi_extra for /docs;
+# the handler parses the raw body itself so Pydantic never walks the
+# messages list on the hot path
+@app.post("/v1/chat/completions", openapi_extra={
+    "requestBody": {
+        "content": {
+            "application/json": {"schema": ChatCompletionRequest.model_json_schema()}
+        },
+        "required": True,
+    }
+})
+async def chat_completions(request: Request):
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            if request.stream:
-                return StreamingResponse(
-                    stream_chat_response(client, ollama_request),
-                    media_type="text/event-stream"
-                )
-            else:
-                response = await client.post(
-                    f"{OLLAMA_HOST}/api/chat",
-                    json=ollama_request
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=422, detail="request body must be valid JSON")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=422, detail="request body must be a JSON object")
+    model = body.setdefault("model", DEFAULT_MODEL)
+    messages = body.get("messages")
+    if not isinstance(model, str) or not isinstance(messages, list):
+        raise HTTPException(status_code=422, detail="model must be a string and messages a list")
+
+    # The OpenAI and Ollama chat schemas only differ in where sampling
+    # params live, so rewrite the parsed body in place and forward it
+    # instead of building a second dict
+    temperature = body.pop("temperature", 0.7)
+    if temperature is None:
+        temperature = 0.7
+    if isinstance(temperature, bool) or not isinstance(temperature, (int, float)):
+        raise HTTPException(status_code=422, detail="temperature must be a number")
+    max_tokens = body.pop("max_tokens", None)
+    if max_tokens is not None and (isinstance(max_tokens, bool) or not isinstance(max_tokens, int)):
+        raise HTTPException(status_code=422, detail="max_tokens must be an integer")
+    stream = bool(body.setdefault("stream", False))
+    options = body.setdefault("options", {})
+    options["temperature"] = temperature
+    if max_tokens:
+        options["num_predict"] = max_tokens
+    ollama_request = body
+
+    # Only deterministic, non-streaming requests are cacheable
+    cache_key = None
+    query_vec = None
+    upstream_task = None
+    if not stream and temperature <= 0:
+        cache_key = sha256(orjson.dumps({
+            "m": model,
+            "msgs": messages,
+            "t": temperature,
+            "n": max_tokens
+        }, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(
+                content={
+                    **cached,
+                    "id": f"chatcmpl-{os.urandom(4).hex()}",
+                    "created": int(time.time())
+                },
+                headers={"X-Cache": "HIT"}
+            )
+
+        if SEMANTIC_CACHE:
+            # The semantic lookup costs an embedding round-trip, so start
+            # the Ollama call speculatively and cancel it on a hit; on a
+            # miss the generation has already been running for the length
+            # of the lookup
+            upstream_task = asyncio.create_task(CLIENT.post(
+                f"{OLLAMA_HOST}/api/chat",
+                content=orjson.dumps(ollama_request),
+                headers=JSON_HEADERS
+            ))
+            try:
+                query_vec = await embed_text(
+                    "\n".join(msg.get("content", "") for msg in messages if msg.get("role") == "user")
                 )
-                ollama_response = response.json()
-                
-                # Convert Ollama response to OpenAI format
-                return {
-                    "id": f"chatcmpl-{uuid.uuid4().hex[:8]}",
-                    "object": "chat.completion",
-                    "created": int(time.time()),
-                    "model": request.model,
-                    "choices": [{
-                        "index": 0,
-                        "message": {
-                            "role": "assistant",
-                            "content": ollama_response["message"]["content"]
+                cached = semantic_lookup(query_vec, (model, temperature, max_tokens))
+                if cached is not None:
+                    upstream_task.cancel()
+                    # Back-fill the exact-match cache so the next identical
+                    # request skips the embedding call; safe because the
+                    # lookup only matches entries with the same params
+                    RESPONSE_CACHE[cache_key] = cached
+                    return ORJSONResponse(
+                        content={
+                            **cached,
+                            "id": f"chatcmpl-{os.urandom(4).hex()}",
+                            "created": int(time.time())
                         },
-                        "finish_reason": "stop"
-                    }],
-                    "usage": {
-                        "prompt_tokens": ollama_response.get("prompt_eval_count", 0),
-                        "completion_tokens": ollama_response.get("eval_count", 0),
-                        "total_tokens": ollama_response.get("prompt_eval_count", 0) + ollama_response.get("eval_count", 0)
-                    }
-                }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+                        headers={"X-Cache": "HIT"}
+                    )
+            except Exception:
+                # Embedding failures should never block the request
+                query_vec = None
+
+    if stream:
+        return StreamingResponse(
+            stream_chat_response(CLIENT, ollama_request),
+            media_type="text/event-stream",
+            headers={
+                # Stop nginx (and other proxies) from buffering the
+                # stream until the response completes
+                "X-Accel-Buffering": "no",
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+            }
+        )
+
+    if upstream_task is not None:
+        # Speculative call launched alongside the semantic lookup
+        response = await upstream_task
+    else:
+        response = await CLIENT.post(
+            f"{OLLAMA_HOST}/api/chat",
+            content=orjson.dumps(ollama_request),
+            headers=JSON_HEADERS
+        )
+    # Route upstream non-2xx (e.g. model not pulled) through the 502
+    # handler instead of choking on the error body below
+    response.raise_for_status()
+    ollama_response = orjson.loads(response.content)
+    prompt_tokens = ollama_response.get("prompt_eval_count", 0)
+    completion_tokens = ollama_response.get("eval_count", 0)
+
+    # Convert Ollama response to OpenAI format
+    openai_response = {
+        "id": f"chatcmpl-{os.urandom(4).hex()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {
+                "role": "assistant",
+                "content": ollama_response["message"]["content"]
+            },
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+    if cache_key is not None:
+        RESPONSE_CACHE[cache_key] = openai_response
+        if query_vec is not None:
+            semantic_store(query_vec, (model, temperature, max_tokens), openai_response)
+        return ORJSONResponse(content=openai_response, headers={"X-Cache": "MISS"})
+    return openai_response
+
+async def iter_upstream_frames(response):
+    """Yield complete JSON documents from an Ollama byte stream.
+
+    Default mode splits NDJSON on b'\\n' with an incremental buffer.
+    When OLLAMA_FRAMING=length, the upstream (a length-prefixing gateway
+    in front of Ollama) sends "<len>\\n<payload>" frames, so the parser
+    slices exactly len bytes per document instead of scanning every
+    byte for the delimiter.
+    """
+    buf = bytearray()
+    if OLLAMA_FRAMING == "length":
+        need = -1  # payload bytes outstanding; -1 while reading a header
+        async for data in response.aiter_bytes():
+            buf.extend(data)
+            while True:
+                if need < 0:
+                    i = buf.find(b"\n")
+                    if i < 0:
+                        break
+                    header = bytes(buf[:i])
+                    del buf[:i + 1]
+                    if not header:
+                        continue
+                    need = int(header)
+                if len(buf) < need:
+                    break
+                frame = bytes(buf[:need])
+                del buf[:need]
+                need = -1
+                if frame:
+                    yield frame
+    else:
+        async for data in response.aiter_bytes():
+            buf.extend(data)
+            while True:
+                i = buf.find(b"\n")
+                if i < 0:
+                    break
+                line = bytes(buf[:i])
+                del buf[:i + 1]
+                if line:
+                    yield line
 
 async def stream_chat_response(client: httpx.AsyncClient, ollama_request: dict):
     """Stream chat completions in OpenAI format"""
-    request_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
-    
+    request_id = f"chatcmpl-{os.urandom(4).hex()}"
+    # One timestamp and model-name lookup per stream, not per token
+    created = int(time.time())
+    model_name = ollama_request["model"]
+
+    # Reusable chunk skeleton: only delta["content"] changes per token,
+    # so the loop mutates one dict instead of rebuilding the nesting
+    template = {
+        "id": request_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model_name,
+        "choices": [{
+            "index": 0,
+            "delta": {"content": ""},
+            "finish_reason": None
+        }]
+    }
+    delta = template["choices"][0]["delta"]
+    final_chunk = {
+        "id": request_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model_name,
+        "choices": [{
+            "index": 0,
+            "delta": {},
+            "finish_reason": "stop"
+        }]
+    }
+
     async with client.stream(
         "POST",
         f"{OLLAMA_HOST}/api/chat",
-        json=ollama_request
+        content=orjson.dumps(ollama_request),
+        headers=JSON_HEADERS
     ) as response:
-        async for line in response.aiter_lines():
-            if line:
-                try:
-                    ollama_chunk = json.loads(line)
-                    if "message" in ollama_chunk:
-                        content = ollama_chunk["message"].get("content", "")
-                        if content:
-                            # Convert to OpenAI streaming format
-                            chunk = {
-                                "id": request_id,
-                                "object": "chat.completion.chunk",
-                                "created": int(time.time()),
-                                "model": ollama_request["model"],
-                                "choices": [{
-                                    "index": 0,
-                                    "delta": {"content": content},
-                                    "finish_reason": None
-                                }]
-                            }
-                            yield f"data: {json.dumps(chunk)}\n\n"
-                        
-                        if ollama_chunk.get("done", False):
-                            # Send final chunk
-                            final_chunk = {
-                                "id": request_id,
-                                "object": "chat.completion.chunk",
-                                "created": int(time.time()),
-                                "model": ollama_request["model"],
-                                "choices": [{
-                                    "index": 0,
-                                    "delta": {},
-                                    "finish_reason": "stop"
-                                }]
-                            }
-                            yield f"data: {json.dumps(final_chunk)}\n\n"
-                            yield "data: [DONE]\n\n"
-                except json.JSONDecodeError:
-                    continue
+        async for line in iter_upstream_frames(response):
+            try:
+                ollama_chunk = orjson.loads(line)
+                if "message" in ollama_chunk:
+                    content = ollama_chunk["message"].get("content", "")
+                    if content:
+                        # Convert to OpenAI streaming format
+                        delta["content"] = content
+                        yield b"data: " + orjson.dumps(template) + b"\n\n"
+
+                    if ollama_chunk.get("done", False):
+                        # Send final chunk
+                        yield b"data: " + orjson.dumps(final_chunk) + b"\n\n"
+                        yield b"data: [DONE]\n\n"
+            except orjson.JSONDecodeError:
+                continue
+
+@lru_cache(maxsize=64)
+def request_skeleton(model: str, temperature: float, max_tokens: Optional[int], stream: bool) -> dict:
+    """Memoized Ollama request shape for a (model, sampling) combination.
+
+    Steady-state traffic reuses a handful of shapes, so the nested
+    options dict is built once per combination. Callers must not mutate
+    the returned dict or its options.
+    """
+    skeleton = {
+        "model": model,
+        "stream": stream,
+        "options": {
+            "temperature": temperature,
+        }
+    }
+    if max_tokens:
+        skeleton["options"]["num_predict"] = max_tokens
+    return skeleton
 
 @app.post("/v1/completions")
 async def completions(request: CompletionRequest):
     ollama_request = {
+        **request_skeleton(request.model, request.temperature, request.max_tokens, request.stream),
+        "prompt": request.prompt
+    }
+
+    # Only deterministic, non-streaming requests are cacheable
+    cache_key = None
+    if not request.stream and request.temperature <= 0:
+        cache_key = sha256(orjson.dumps({
+            "m": request.model,
+            "p": request.prompt,
+            "t": request.temperature,
+            "n": request.max_tokens
+        }, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(
+                content={
+                    **cached,
+                    "id": f"cmpl-{os.urandom(4).hex()}",
+                    "created": int(time.time())
+                },
+                headers={"X-Cache": "HIT"}
+            )
+
+    if request.stream:
+        return StreamingResponse(
+            stream_completion_response(CLIENT, ollama_request),
+            media_type="text/event-stream",
+            headers={
+                "X-Accel-Buffering": "no",
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+            }
+        )
+
+    response = await CLIENT.post(
+        f"{OLLAMA_HOST}/api/generate",
+        content=orjson.dumps(ollama_request),
+        headers=JSON_HEADERS
+    )
+    response.raise_for_status()
+    ollama_response = orjson.loads(response.content)
+    prompt_tokens = ollama_response.get("prompt_eval_count", 0)
+    completion_tokens = ollama_response.get("eval_count", 0)
+
+    openai_response = {
+        "id": f"cmpl-{os.urandom(4).hex()}",
+        "object": "text_completion",
+        "created": int(time.time()),
         "model": request.model,
-        "prompt": request.prompt,
-        "stream": request.stream,
-        "options": {
-            "temperature": request.temperature,
+        "choices": [{
+            "text": ollama_response["response"],
+            "index": 0,
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
         }
     }
-    
-    if request.max_tokens:
-        ollama_request["options"]["num_predict"] = request.max_tokens
 
-    try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            if request.stream:
-                return StreamingResponse(
-                    stream_completion_response(client, ollama_request),
-                    media_type="text/event-stream"
-                )
-            else:
-                response = await client.post(
-                    f"{OLLAMA_HOST}/api/generate",
-                    json=ollama_request
-                )
-                ollama_response = response.json()
-                
-                return {
-                    "id": f"cmpl-{uuid.uuid4().hex[:8]}",
-                    "object": "text_completion",
-                    "created": int(time.time()),
-                    "model": request.model,
-                    "choices": [{
-                        "text": ollama_response["response"],
-                        "index": 0,
-                        "finish_reason": "stop"
-                    }],
-                    "usage": {
-                        "prompt_tokens": ollama_response.get("prompt_eval_count", 0),
-                        "completion_tokens": ollama_response.get("eval_count", 0),
-                        "total_tokens": ollama_response.get("prompt_eval_count", 0) + ollama_response.get("eval_count", 0)
-                    }
-                }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    if cache_key is not None:
+        RESPONSE_CACHE[cache_key] = openai_response
+        return ORJSONResponse(content=openai_response, headers={"X-Cache": "MISS"})
+    return openai_response
 
 async def stream_completion_response(client: httpx.AsyncClient, ollama_request: dict):
     """Stream completions in OpenAI format"""
-    request_id = f"cmpl-{uuid.uuid4().hex[:8]}"
-    
+    request_id = f"cmpl-{os.urandom(4).hex()}"
+    created = int(time.time())
+    model_name = ollama_request["model"]
+
+    # Same reusable skeleton as stream_chat_response
+    template = {
+        "id": request_id,
+        "object": "text_completion",
+        "created": created,
+        "model": model_name,
+        "choices": [{
+            "text": "",
+            "index": 0,
+            "finish_reason": None
+        }]
+    }
+    choice = template["choices"][0]
+
     async with client.stream(
         "POST",
         f"{OLLAMA_HOST}/api/generate",
-        json=ollama_request
+        content=orjson.dumps(ollama_request),
+        headers=JSON_HEADERS
     ) as response:
-        async for line in response.aiter_lines():
-            if line:
-                try:
-                    ollama_chunk = json.loads(line)
-                    text = ollama_chunk.get("response", "")
-                    if text:
-                        chunk = {
-                            "id": request_id,
-                            "object": "text_completion",
-                            "created": int(time.time()),
-                            "model": ollama_request["model"],
-                            "choices": [{
-                                "text": text,
-                                "index": 0,
-                                "finish_reason": None
-                            }]
-                        }
-                        yield f"data: {json.dumps(chunk)}\n\n"
-                    
-                    if ollama_chunk.get("done", False):
-                        yield "data: [DONE]\n\n"
-                except json.JSONDecodeError:
-                    continue
+        async for line in iter_upstream_frames(response):
+            try:
+                ollama_chunk = orjson.loads(line)
+                text = ollama_chunk.get("response", "")
+                if text:
+                    choice["text"] = text
+                    yield b"data: " + orjson.dumps(template) + b"\n\n"
+
+                if ollama_chunk.get("done", False):
+                    yield b"data: [DONE]\n\n"
+            except orjson.JSONDecodeError:
+                continue
 
 if __name__ == "__main__":
     print(f"🚀 Starting Ollama OpenAI-Compatible API on port {PORT}")
@@ -274,4 +587,16 @@ if __name__ == "__main__":
     print(f"🌐 Access at: http://localhost:{PORT}")
     print(f"📖 Docs at: http://localhost:{PORT}/docs")
     
-    uvicorn.run(app, host="0.0.0.0", port=PORT, log_level="info")
+    # Pass the app as an import string so uvicorn can fork WORKERS
+    # processes; the shared client is created in the startup hook, so
+    # each worker gets its own connection pool post-fork
+    uvicorn.run(
+        "ollama-api:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host="0.0.0.0",
+        port=PORT,
+        workers=WORKERS,
+        loop="uvloop",
+        http="httptools",
+        log_level="info",
+    )